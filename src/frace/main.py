@@ -1,40 +1,82 @@
 import asyncio
+import heapq
 import logging
+import random
 import time
-from typing import Any, Dict, List, Tuple, Optional
+from collections import ChainMap
+from typing import Any, Callable, Dict, List, Mapping, Set, Tuple, Optional, Union
 
 from frace.models import FraceException, FunctionModel
 
 logger = logging.getLogger("frace")
 
+# Sentinel returned by _run_function when a bucket is exhausted, so the race
+# harness does not pay exception unwinding for an expected outcome
+_BUCKET_EXHAUSTED = object()
+
+# Upper bound on the per-bucket-shape caches; callers composing buckets
+# dynamically per call would otherwise grow them without limit
+_BUCKET_CACHE_LIMIT = 128
+
 class FunctionRaceCaller:
     """
     Manages and calls functions with resilience, switching to alternate functions upon failures.
 
     :param max_failures: Number of consecutive failures after which to switch functions.
     :param function_timeouts: Mapping of function IDs to their timeouts.
+    :param base_backoff: Backoff in seconds a function is reset to after a success.
+    :param max_backoff: Upper bound in seconds for the exponential backoff.
+    :param backoff_jitter: Fraction of random upward jitter applied to each backoff.
+    :param stagger: Delay in seconds before each subsequent bucket joins the race.
+        With the default of 0 all buckets start immediately; a positive value
+        hedges the call, only materializing slower racers if the leading bucket
+        has not produced a result yet.
     """
 
-    def __init__(self, max_failures: int = 2, function_timeouts: Dict[str, float] = {}):
-        self.function_timeouts = function_timeouts
+    def __init__(self, max_failures: int = 2, function_timeouts: Optional[Dict[str, float]] = None, base_backoff: float = 1.0, max_backoff: float = 60.0, backoff_jitter: float = 0.25, stagger: float = 0.0):
+        self.function_timeouts = dict(function_timeouts or {})
         self.max_failures = max_failures
+        self.base_backoff = base_backoff
+        self.max_backoff = max_backoff
+        self.backoff_jitter = backoff_jitter
+        self.stagger = stagger
+        # Backoff schedule precomputed once, indexed by failure streak, so a
+        # failure costs an array index instead of an exponentiation
+        self._backoff_table: Tuple[float, ...] = tuple(min(max_backoff, base_backoff * (1 << i)) for i in range(32))
 
         # Map function id to FunctionModel to maintain state across calls
         self.function_models: Dict[str, FunctionModel] = {}
         # Store buckets of function ids
         self.buckets: List[List[str]] = []
+        # Ids currently skipped because they hit max_failures, plus a min-heap
+        # of (reactivation_deadline, func_id) entries to reap them lazily
+        self._failed: Set[str] = set()
+        self._backoff_heap: List[Tuple[float, str]] = []
+        # Cache of the first non-open function id per bucket, invalidated
+        # whenever a circuit changes state or a function is registered
+        self._bucket_heads: Dict[Tuple[str, ...], str] = {}
+        # Bucket id lists resolved to model references once per bucket shape,
+        # invalidated on registration
+        self._resolved_buckets: Dict[Tuple[str, ...], List[FunctionModel]] = {}
 
-    def register_function(self, func_model: FunctionModel):
+    def register_function(self, func_model: Union[FunctionModel, str], func: Optional[Callable[..., Any]] = None):
         """
-        Registers a FunctionModel with the caller.
+        Registers a FunctionModel with the caller. An id/callable pair can be
+        passed instead, in which case the model is created internally.
 
-        :param func_model: Instance of FunctionModel to register.
-        :type func_model: :class:`frace.models.FunctionModel`
+        :param func_model: Instance of FunctionModel to register, or a function id.
+        :param func: The callable for the id when no model is supplied.
+        :type func_model: Union[:class:`frace.models.FunctionModel`, str]
+        :type func: Optional[Callable[..., Any]]
         :return: None
         :rtype: None
         """
+        if func is not None:
+            func_model = FunctionModel(id=func_model, func=func)
         self.function_models[func_model.id] = func_model
-        logger.info(f"Registered function {func_model.id}")
+        self._bucket_heads.clear()
+        self._resolved_buckets.clear()
+        logger.info("Registered function %s", func_model.id)
 
     async def call_functions(self, buckets: List[List[str]], function_args: Dict[str, Tuple[Any, ...]] = None, function_kwargs: Dict[str, Dict[str, Any]] = None, function_timeouts: Optional[Dict[str, float]] = None):
         """
@@ -53,11 +95,15 @@ class FunctionRaceCaller:
         :raises FraceException: If all functions fail.
         """
         logger.debug("Updating configuration for function calls.")
+        # Overlay per-call timeouts on the registered ones without mutating
+        # shared instance state.
         if function_timeouts:
-            self.function_timeouts.update(function_timeouts)
+            effective_timeouts = ChainMap(function_timeouts, self.function_timeouts)
+        else:
+            effective_timeouts = self.function_timeouts
 
         # Handle timeouts and failed functions
-        await self._resolve_failures()
+        self._resolve_failures()
 
         function_args = function_args or {}
         function_kwargs = function_kwargs or {}
@@ -70,40 +116,116 @@ class FunctionRaceCaller:
 
         self.buckets = buckets
 
+        # Fast path: a single bucket has nothing to race against, so skip the
+        # winner future, task creation and cancellation plumbing entirely
+        if len(self.buckets) == 1:
+            func_model = self._select_function(self.buckets[0])
+            if func_model is None:
+                raise FraceException("All functions currently circuit-open")
+            return await self._run_function(func_model, self.buckets[0], set(), timeouts=effective_timeouts)
+
         selected_functions = []
         for bucket in self.buckets:
             func_model = self._select_function(bucket)
             if func_model is not None:
                 selected_functions.append((func_model, bucket))
 
+        # Under a full outage there is nothing to race; fail fast instead of
+        # setting up tasks that can never succeed
+        if not selected_functions:
+            raise FraceException("All functions currently circuit-open")
+
+        loop = asyncio.get_running_loop()
+        # Single future resolved by the first successful task; each completion
+        # is handled in O(1) instead of re-entering asyncio.wait over all tasks.
+        winner = loop.create_future()
+        failed_count = 0
+        total_tasks = len(selected_functions)
+
+        async def _race(func_model, bucket):
+            # Bucket exhaustion comes back as a sentinel and unexpected errors
+            # are folded into it, so a failing bucket never aborts the
+            # TaskGroup and cancels its still-running peers
+            nonlocal failed_count
+            try:
+                result = await self._run_function(func_model, bucket, set(), timeouts=effective_timeouts, raise_on_exhausted=False)
+            except asyncio.CancelledError:
+                raise
+            except Exception as exception:
+                logger.error("Function failed: %s", exception)
+                result = _BUCKET_EXHAUSTED
+            if result is _BUCKET_EXHAUSTED:
+                failed_count += 1
+                # A failure means hedging no longer saves work; start any
+                # buckets still waiting on their stagger delay right away
+                _start_all_deferred()
+                if failed_count == total_tasks and not winner.done():
+                    # Freshly allocated so races never share traceback or
+                    # context state; this path already paid for every bucket
+                    # failing, so the allocation is noise
+                    winner.set_exception(FraceException("No function succeeded"))
+            elif not winner.done():
+                logger.info("Function succeeded with result: %s", result)
+                winner.set_result(result)
+
         tasks = []
-        for func_model, bucket in selected_functions:
-            coro = self._run_function(func_model, bucket, [])
-            tasks.append(asyncio.create_task(coro))
-
-        pending_tasks = set(tasks)
-
-        while pending_tasks:
-            # Await for the first task to complete
-            done, pending = await asyncio.wait(pending_tasks, return_when=asyncio.FIRST_COMPLETED)
-            
-            # Remove done tasks from the pending tasks
-            pending_tasks = pending
-
-            for task in done:
-                try:
-                    # Try to get the result of the completed task
-                    result = task.result()
-                    logger.info(f"Function succeeded with result: {result}")
-                    for pending_task in pending:
-                        pending_task.cancel()
-                    return result
-                except Exception as e:
-                    logger.error(f"Function failed: {e}")
-                    # Continue the loop to try the next fastest task
-                    continue
-
-        raise FraceException("No function succeeded")
+        race_error = None
+        # Buckets deferred by the stagger delay, keyed by their launch order
+        deferred: Dict[int, Tuple[asyncio.TimerHandle, FunctionModel, List[str]]] = {}
+
+        # The TaskGroup guarantees every racer, including losers cancelled
+        # below, is fully finalized before call_functions returns.
+        async with asyncio.TaskGroup() as task_group:
+            # Bind method lookups once; each scheduled bucket and timer
+            # callback pays a LOAD_FAST instead of repeated LOAD_ATTR chains
+            create_task = task_group.create_task
+            call_later = loop.call_later
+            append_task = tasks.append
+            stagger = self.stagger
+
+            def _start_task(func_model, bucket):
+                if winner.done():
+                    return
+                append_task(create_task(_race(func_model, bucket)))
+
+            def _start_deferred(index):
+                entry = deferred.pop(index, None)
+                if entry is None:
+                    return
+                handle, func_model, bucket = entry
+                handle.cancel()
+                _start_task(func_model, bucket)
+
+            def _start_all_deferred():
+                for index in list(deferred):
+                    _start_deferred(index)
+
+            for index, (func_model, bucket) in enumerate(selected_functions):
+                if stagger and index > 0:
+                    handle = call_later(index * stagger, _start_deferred, index)
+                    deferred[index] = (handle, func_model, bucket)
+                else:
+                    _start_task(func_model, bucket)
+
+            try:
+                result = await winner
+            except FraceException as exception:
+                # Held back until the group exits; on 3.11/3.12 an exception
+                # leaving the TaskGroup body gets wrapped in an ExceptionGroup
+                race_error = exception
+            finally:
+                # Buckets that never left the timer heap cost nothing to drop
+                for handle, _, _ in deferred.values():
+                    handle.cancel()
+                deferred.clear()
+                for task in tasks:
+                    # Skip tasks that already have a cancellation in flight so
+                    # each loser re-enters the loop exactly once
+                    if not task.done() and not task.cancelling():
+                        task.cancel()
+        if race_error is not None:
+            raise race_error
+        return result
 
     async def get_ids_on_timeout(self):
         """
@@ -112,47 +234,54 @@ class FunctionRaceCaller:
         :return: List of ids of the functions that have timed out/currently failing and bypassed
         :rtype: List[str]
         """
-        # Resolve if any function has timed out
-        await self._resolve_failures()
+        # Resolve if any function has timed out; the method itself stays a
+        # coroutine for backward compatibility even though nothing awaits
+        self._resolve_failures()
+        return list(self._failed)
 
-        ids = []
-        for func_id, func_model in self.function_models.items():
-            if func_model.failures >= self.max_failures:
-                ids.append(func_id)
-        return ids
-
-    async def _run_function(self, func_model: FunctionModel, bucket: List[str], excluded_model_ids: List[str] = []):
+    async def _run_function(self, func_model: FunctionModel, bucket: List[str], excluded_model_ids: Optional[Set[str]] = None, timeouts: Optional[Mapping[str, float]] = None, raise_on_exhausted: bool = True):
         """
         Executes a function and handles failures by retrying the next available function in the bucket.
         """
-        try:
-            timeout = self.function_timeouts.get(func_model.id, None)
-            if timeout:
-                result = await asyncio.wait_for(func_model.call(), timeout=timeout)
-            else:
-                result = await func_model.call()
-        except asyncio.CancelledError:
-            raise
-        except (Exception, asyncio.TimeoutError) as e:
-            if isinstance(e, asyncio.TimeoutError):
-                logger.warning(f"Function {func_model.id} timed out.")
-            else:
-                logger.warning(f"Function {func_model.id} failed with error: {e}")
-            await self._handle_failure(func_model)
-
-            # Select the next function and retry if available
-            excluded_model_ids.append(func_model.id)
-            next_func_model = self._select_function(bucket, excluded_model_ids)
-            if next_func_model:
-                return await self._run_function(next_func_model, bucket, excluded_model_ids)
+        if excluded_model_ids is None:
+            excluded_model_ids = set()
+        if timeouts is None:
+            timeouts = self.function_timeouts
+        while True:
+            try:
+                timeout = timeouts.get(func_model.id, None)
+                # asyncio.timeout applies the deadline to the current task
+                # directly, without wrapping the call in an extra Task the
+                # way asyncio.wait_for does.
+                async with asyncio.timeout(timeout if timeout else None):
+                    result = await func_model.call()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                if isinstance(e, TimeoutError):
+                    logger.warning("Function %s timed out.", func_model.id)
+                else:
+                    logger.warning("Function %s failed with error: %s", func_model.id, e)
+                self._handle_failure(func_model)
+
+                # Select the next function and retry if available
+                excluded_model_ids.add(func_model.id)
+                next_func_model = self._select_function(bucket, excluded_model_ids)
+                if next_func_model is None:
+                    logger.error("All functions in the bucket have failed.")
+                    if raise_on_exhausted:
+                        raise FraceException("No function succeeded in current bucket.")
+                    return _BUCKET_EXHAUSTED
+                func_model = next_func_model
             else:
-                logger.error(f"All functions in the bucket have failed.")
-                raise FraceException("No function succeeded in current bucket.")
-        else:
-            # Reset failure state on success
-            func_model.failures = 0
-            func_model.backoff = 1.0
-            return result
+                # Reset failure state on success, closing the circuit again
+                func_model.failures = 0
+                func_model.failure_streak = 0
+                func_model.backoff = self.base_backoff
+                func_model.state = "closed"
+                func_model.reactivate_at = None
+                self._failed.discard(func_model.id)
+                return result
         
     async def get_function_remaining_timeout_in_seconds(self, func_id: str):
         """
@@ -163,42 +292,80 @@ class FunctionRaceCaller:
         :return: The timeout in seconds for the function.
         :rtype: float
         """
-        timerem = time.time()
         func_model = self.function_models[func_id]
-        if func_model.failures >= self.max_failures:
-            return func_model.backoff - (timerem - func_model.last_failure_time)
-        else:
-            return 0.0
+        if func_model.failures >= self.max_failures and func_model.reactivate_at is not None:
+            return max(0.0, func_model.reactivate_at - time.monotonic())
+        return 0.0
 
-    async def _handle_failure(self, func_model: FunctionModel):
+    def _handle_failure(self, func_model: FunctionModel):
         func_model.failures += 1
-        func_model.last_failure_time = time.time()
-        func_model.backoff *= 2
+        func_model.failure_streak += 1
+        func_model.last_failure_time = time.monotonic()
+        # Capped exponential backoff with upward jitter so that functions
+        # failing against the same backend do not retry in lockstep
+        func_model.backoff = self._backoff_table[min(func_model.failure_streak, 31)] * random.uniform(1.0, 1.0 + self.backoff_jitter)
+        if func_model.failures >= self.max_failures:
+            func_model.state = "open"
+            func_model.reactivate_at = func_model.last_failure_time + func_model.backoff
+            self._failed.add(func_model.id)
+            self._bucket_heads.clear()
+            heapq.heappush(self._backoff_heap, (func_model.reactivate_at, func_model.id))
 
-    async def _resolve_failures(self):
+    def _resolve_failures(self):
         """
-        Updates the state of all failed or timed-out functions to dynamically adjust call behavior.
+        Reactivates failed functions whose backoff period has elapsed.
+        Only functions currently on timeout are examined, so the cost scales with
+        the number of failed functions rather than the size of the registry.
         """
-        current_time = time.time()
-        for func_id, func_model in self.function_models.items():
-            if func_model.failures >= self.max_failures:
-                # Check if the backoff period has elapsed
-                if current_time - func_model.last_failure_time > func_model.backoff:
-                    logger.info(f"Reactivating function {func_id} after {func_model.failures} failures.")
-                    func_model.failures = self.max_failures - 1
-                else:
-                    remaining_time = func_model.backoff - (current_time - func_model.last_failure_time)
-                    logger.debug(f"Function {func_id} will be reactivated in {remaining_time:.2f} seconds.")
+        current_time = time.monotonic()
+        while self._backoff_heap and self._backoff_heap[0][0] <= current_time:
+            deadline, func_id = heapq.heappop(self._backoff_heap)
+            func_model = self.function_models.get(func_id)
+            if func_model is None or func_id not in self._failed:
+                # Stale entry, the function recovered or was re-registered
+                continue
+            if func_model.reactivate_at is not None and deadline < func_model.reactivate_at:
+                # Superseded by a newer failure of the same function
+                continue
+            logger.info("Reactivating function %s after %s failures.", func_id, func_model.failures)
+            func_model.failures = self.max_failures - 1
+            func_model.state = "half_open"
+            func_model.reactivate_at = None
+            self._failed.discard(func_id)
+            self._bucket_heads.clear()
 
-    def _select_function(self, bucket: List[str], excluded_model_ids: list[str] = []):
+    def _select_function(self, bucket: List[str], excluded_model_ids: Optional[Set[str]] = None):
         """
-        Selects the first function in the bucket that has not exceeded the max_failures threshold.
+        Selects the first function in the bucket whose circuit is not open.
         Returns None if all functions in the bucket have failed.
         """
-        for func_id in bucket:
-            if func_id in excluded_model_ids:
+        # The cached head only applies to unconstrained selection; retries
+        # with exclusions always rescan
+        bucket_key = tuple(bucket)
+        if not excluded_model_ids:
+            head_id = self._bucket_heads.get(bucket_key)
+            if head_id is not None:
+                return self.function_models[head_id]
+
+        # Resolve bucket ids to model references once per bucket shape so the
+        # scan below is a pointer walk rather than a dict lookup per slot;
+        # this loop runs per task, per bucket, per retry
+        bucket_models = self._resolved_buckets.get(bucket_key)
+        if bucket_models is None:
+            registry = self.function_models
+            bucket_models = [registry[func_id] for func_id in bucket]
+            if len(self._resolved_buckets) >= _BUCKET_CACHE_LIMIT:
+                # Evict the oldest entry to keep the cache bounded
+                self._resolved_buckets.pop(next(iter(self._resolved_buckets)))
+            self._resolved_buckets[bucket_key] = bucket_models
+
+        for func_model in bucket_models:
+            if excluded_model_ids and func_model.id in excluded_model_ids:
                 continue
-            func_model = self.function_models[func_id]
-            if func_model.failures < self.max_failures:
+            if func_model.state != "open":
+                if not excluded_model_ids:
+                    if len(self._bucket_heads) >= _BUCKET_CACHE_LIMIT:
+                        self._bucket_heads.pop(next(iter(self._bucket_heads)))
+                    self._bucket_heads[bucket_key] = func_model.id
                 return func_model
         return None  # All functions have failed
\ No newline at end of file
@@ -1,10 +1,12 @@
+import functools
 import logging
-from pydantic import BaseModel
-from typing import Any, Callable, Dict, List, Tuple, Optional
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Literal, Tuple, Optional
 
 logger = logging.getLogger("frace")
 
-class FunctionModel(BaseModel):
+@dataclass(slots=True)
+class FunctionModel:
     """
     Represents a function to be called with metadata for resilience.
 
@@ -13,16 +15,27 @@ class FunctionModel(BaseModel):
     :param args: Positional arguments for the function.
     :param kwargs: Keyword arguments for the function.
     :param failures: Count of consecutive failures.
+    :param failure_streak: Failures since the last success; only a success resets it.
     :param last_failure_time: Timestamp of the last failure.
     :param backoff: Time in seconds to wait before retrying after a failure.
+    :param state: Circuit state; open circuits are skipped during selection.
+    :param reactivate_at: Monotonic deadline at which an open circuit reactivates.
     """
     id: str  # Unique identifier for the function
     func: Callable[..., Any]
     args: Tuple[Any, ...] = ()
-    kwargs: Dict[str, Any] = {}
+    kwargs: Dict[str, Any] = field(default_factory=dict)
     failures: int = 0
+    failure_streak: int = 0
     last_failure_time: Optional[float] = None
     backoff: float = 1.0  # seconds
+    state: Literal["closed", "open", "half_open"] = "closed"
+    reactivate_at: Optional[float] = None
+    # Cached binding of func/args/kwargs, rebuilt when any of them is replaced.
+    # In-place mutation of the args/kwargs objects themselves is not detected.
+    _bound: Optional[Callable[[], Any]] = field(default=None, init=False, repr=False)
+    _bound_args: Optional[Tuple[Any, ...]] = field(default=None, init=False, repr=False)
+    _bound_kwargs: Optional[Dict[str, Any]] = field(default=None, init=False, repr=False)
 
     async def call(self):
         """
@@ -31,11 +44,19 @@ class FunctionModel(BaseModel):
         :return: The result of the function call.
         :raises Exception: Propagates any exception raised by the function.
         """
-        logger.debug(f"Calling function {self.id} with args: {self.args}, kwargs: {self.kwargs}")
-        return await self.func(*self.args, **self.kwargs)
+        # Gated because stringifying arbitrary args/kwargs can be expensive
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Calling function %s with args: %s, kwargs: %s", self.id, self.args, self.kwargs)
+        bound = self._bound
+        if bound is None or bound.func is not self.func or self._bound_args is not self.args or self._bound_kwargs is not self.kwargs:
+            bound = functools.partial(self.func, *self.args, **self.kwargs)
+            self._bound = bound
+            self._bound_args = self.args
+            self._bound_kwargs = self.kwargs
+        return await bound()
 
 class FraceException(Exception):
     """
     Custom exception class for Frace.
     """
-    pass
\ No newline at end of file
+    pass
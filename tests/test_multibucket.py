@@ -2,7 +2,7 @@ import asyncio
 import logging
 import pytest
 
-from frace import FunctionRaceCaller, FunctionModel
+from frace import FunctionRaceCaller, FunctionModel, FraceException
 
 # Adjust the logger to output messages to the console
 logger = logging.getLogger("frace")
@@ -67,3 +67,96 @@ async def test_multi_bucket_failover(race_caller):
     # Verify that func1 and func2 were called
     assert call_counts["func1"] == 1
     assert call_counts["func2"] == 1
+
+@pytest.mark.asyncio
+async def test_losers_cancelled_after_winner(race_caller):
+    """
+    Tests that losing racers are cancelled and fully finalized by the time
+    call_functions returns with the winning result.
+    """
+    cancelled = {"slow": False}
+
+    async def fast():
+        return "fast"
+
+    async def slow():
+        try:
+            await asyncio.sleep(5)
+        except asyncio.CancelledError:
+            cancelled["slow"] = True
+            raise
+        return "slow"
+
+    race_caller.register_function(FunctionModel(id="fast", func=fast))
+    race_caller.register_function(FunctionModel(id="slow", func=slow))
+
+    result = await race_caller.call_functions([["slow"], ["fast"]])
+    assert result == "fast"
+    assert cancelled["slow"] is True
+
+@pytest.mark.asyncio
+async def test_multi_bucket_all_fail(race_caller):
+    """
+    Tests that the race only fails once every bucket's task has resolved,
+    surfacing the aggregate failure to the caller as a FraceException.
+    """
+    async def fail_fast():
+        raise Exception("fail_fast failed")
+
+    async def fail_slow():
+        await asyncio.sleep(0.1)
+        raise Exception("fail_slow failed")
+
+    race_caller.register_function(FunctionModel(id="fail_fast", func=fail_fast))
+    race_caller.register_function(FunctionModel(id="fail_slow", func=fail_slow))
+
+    with pytest.raises(FraceException, match="No function succeeded"):
+        await race_caller.call_functions([["fail_fast"], ["fail_slow"]])
+
+@pytest.mark.asyncio
+async def test_stagger_winner_suppresses_deferred_bucket():
+    """
+    Tests that with a stagger delay, a win from the leading bucket keeps the
+    deferred bucket's function from ever being invoked.
+    """
+    race_caller = FunctionRaceCaller(max_failures=2, stagger=5.0)
+    call_counts = {"leader": 0, "hedge": 0}
+
+    async def leader():
+        call_counts["leader"] += 1
+        return "leader success"
+
+    async def hedge():
+        call_counts["hedge"] += 1
+        return "hedge success"
+
+    race_caller.register_function(FunctionModel(id="leader", func=leader))
+    race_caller.register_function(FunctionModel(id="hedge", func=hedge))
+
+    result = await race_caller.call_functions([["leader"], ["hedge"]])
+    assert result == "leader success"
+    assert call_counts["leader"] == 1
+    assert call_counts["hedge"] == 0
+
+@pytest.mark.asyncio
+async def test_stagger_failure_starts_deferred_bucket_early():
+    """
+    Tests that a failure in the leading bucket launches deferred buckets
+    immediately rather than waiting out the stagger delay.
+    """
+    race_caller = FunctionRaceCaller(max_failures=2, stagger=5.0)
+
+    async def fail_fast():
+        raise Exception("fail_fast failed")
+
+    async def hedge():
+        return "hedge success"
+
+    race_caller.register_function(FunctionModel(id="fail_fast", func=fail_fast))
+    race_caller.register_function(FunctionModel(id="hedge", func=hedge))
+
+    start = asyncio.get_running_loop().time()
+    result = await race_caller.call_functions([["fail_fast"], ["hedge"]])
+    elapsed = asyncio.get_running_loop().time() - start
+    assert result == "hedge success"
+    assert elapsed < 1.0
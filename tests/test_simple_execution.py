@@ -51,3 +51,13 @@ async def test_one_bucket_malfunction(race_caller):
     buckets = [["good"], ["bad"]]
     result = await race_caller.call_functions(buckets)
     assert result == "good"
+
+@pytest.mark.asyncio
+async def test_register_function_with_id_and_callable(race_caller):
+    async def plain():
+        return "plain"
+
+    race_caller.register_function("plain", plain)
+
+    result = await race_caller.call_functions([["plain"]])
+    assert result == "plain"
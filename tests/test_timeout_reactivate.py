@@ -89,4 +89,16 @@ async def test_all_functions_fail(race_caller, failing_function_model):
         await race_caller.call_functions(buckets)
 
 # @pytest.mark.asyncio
-# async def test_successively_increasing_timeouts
\ No newline at end of file
+# async def test_successively_increasing_timeouts
+@pytest.mark.asyncio
+async def test_all_functions_fail_multiple_buckets(race_caller, failing_function_model):
+    """Tests that a multi-bucket race raises FraceException itself, not an ExceptionGroup."""
+    async def another_failing_function():
+        raise Exception("Function failed")
+
+    race_caller.register_function(failing_function_model)
+    race_caller.register_function(FunctionModel(id="func_fail2", func=another_failing_function))
+
+    buckets = [["func_fail"], ["func_fail2"]]
+    with pytest.raises(FraceException, match="No function succeeded"):
+        await race_caller.call_functions(buckets)